@@ -0,0 +1,227 @@
+# Verified Python 3.11 compatible
+"""
+Auto-Night (quiet hours) settings and helpers, shared by the worker
+(runner.py) and the management CLI (login.py).
+"""
+import functools
+import re
+from datetime import datetime, time, timedelta, timezone
+from typing import Tuple, Optional, NamedTuple
+
+try:
+    from zoneinfo import ZoneInfo  # Python 3.9+
+except Exception:
+    ZoneInfo = None  # will fall back to local time without TZ
+
+import db
+
+DEFAULT_AUTONIGHT = {
+    "enabled": True,
+    "start": "00:00",        # 24h format HH:MM
+    "end": "06:00",          # 24h format HH:MM
+    "tz": "Asia/Kolkata"
+}
+# Used when the tz database is unavailable (IST has no DST, so a fixed offset is exact)
+_IST = timezone(timedelta(hours=5, minutes=30))
+
+# Patterns used by Auto-Night parsing, compiled once
+_HH_RE = re.compile(r"\d{1,2}")
+_HHMM_RE = re.compile(r"(\d{1,2}):(\d{2})")
+_RANGE_RE = re.compile(r"\s*(\d{1,2}(?::\d{2})?)\s*(?:to|–|—|-)\s*(\d{1,2}(?::\d{2})?)\s*")
+
+
+def _load_autonight() -> dict:
+    return db.get_autonight_settings()
+
+def _save_autonight(cfg: dict) -> None:
+    db.save_autonight_settings(cfg)
+
+@functools.lru_cache(maxsize=64)
+def _parse_hhmm(s: str) -> time:
+    s = s.strip()
+    # Accept "7", "07", "7:00", "07:00"
+    if _HH_RE.fullmatch(s):
+        h = int(s)
+        if not (0 <= h <= 23):
+            raise ValueError("Hour must be 0..23")
+        return time(h, 0)
+    m = _HHMM_RE.fullmatch(s)
+    if not m:
+        raise ValueError("Time must be HH or HH:MM (24h)")
+    h, mm = int(m.group(1)), int(m.group(2))
+    if not (0 <= h <= 23 and 0 <= mm <= 59):
+        raise ValueError("Invalid time")
+    return time(h, mm)
+
+class _CompiledAutonight(NamedTuple):
+    """Pre-parsed Auto-Night settings used by the hot quiet-hours checks."""
+    enabled: bool
+    start_min: int  # minutes since midnight
+    end_min: int
+    tz: str
+
+@functools.lru_cache(maxsize=32)
+def _compile_autonight_values(enabled: bool, start: str, end: str, tz: str) -> _CompiledAutonight:
+    start_t, end_t = _parse_hhmm(start), _parse_hhmm(end)
+    return _CompiledAutonight(
+        enabled,
+        start_t.hour * 60 + start_t.minute,
+        end_t.hour * 60 + end_t.minute,
+        tz,
+    )
+
+def _compile_autonight(cfg: dict) -> _CompiledAutonight:
+    """Parse an Auto-Night config once; identical configs share a cached result."""
+    return _compile_autonight_values(
+        bool(cfg.get("enabled", True)),
+        cfg.get("start", DEFAULT_AUTONIGHT["start"]),
+        cfg.get("end", DEFAULT_AUTONIGHT["end"]),
+        cfg.get("tz") or DEFAULT_AUTONIGHT["tz"],
+    )
+
+@functools.lru_cache(maxsize=8)
+def _zone(tz_name: str):
+    """Return the ZoneInfo for tz_name, loading the tz database entry once per process."""
+    if ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(tz_name)
+    except Exception:
+        return None
+
+def _get_now_tz(tz_name: str) -> datetime:
+    if not tz_name:
+        tz_name = "Asia/Kolkata"
+    zone = _zone(tz_name)
+    if zone is not None:
+        return datetime.now(zone)
+    # Fallback to timezone offset if we know it's India time
+    if tz_name == "Asia/Kolkata":
+        return datetime.now(_IST)
+    # Fallback: naive local time
+    return datetime.now()
+
+def _in_window_i(now_min: int, start_min: int, end_min: int) -> bool:
+    """True if now is within [start, end) with midnight wrap support; all values in minutes of day."""
+    if start_min <= end_min:
+        return start_min <= now_min < end_min
+    # crosses midnight, e.g., 23:00 -> 07:00
+    return now_min >= start_min or now_min < end_min
+
+def _seconds_until(now: datetime, target_min: int) -> int:
+    """Wall-clock seconds from `now` to the next `target_min` minute of day, in plain integer math."""
+    now_s = now.hour * 3600 + now.minute * 60 + now.second
+    return (target_min * 60 - now_s) % 86400
+
+def _seconds_until_quiet_end(cfg: dict = None, now: Optional[datetime] = None) -> int:
+    """Return seconds until the end of quiet window (>= 1), assuming we are currently in quiet."""
+    if cfg is None:
+        cfg = AUTONIGHT_CFG
+    an = _compile_autonight(cfg)
+    if now is None:
+        now = _get_now_tz(an.tz)
+    return max(1, _seconds_until(now, an.end_min))
+
+def autonight_is_quiet(cfg: dict = None, now: Optional[datetime] = None) -> bool:
+    if cfg is None:
+        cfg = AUTONIGHT_CFG
+    if not cfg.get("enabled", True):
+        return False
+    try:
+        an = _compile_autonight(cfg)
+        if now is None:
+            now = _get_now_tz(an.tz)
+        return _in_window_i(now.hour * 60 + now.minute, an.start_min, an.end_min)
+    except Exception:
+        # Fail open if config broken
+        return False
+
+@functools.lru_cache(maxsize=32)
+def _status_text_values(enabled: bool, start: str, end: str, tz: str) -> str:
+    state = "ACTIVE ✅" if enabled else "DISABLED ❌"
+    return (
+        f"🌙 Auto-Night: **{state}**\n"
+        f"Window: **{start} → {end}**\n"
+        f"TZ: **{tz}**"
+    )
+
+def autonight_status_text(cfg: dict = None) -> str:
+    """Render the Auto-Night summary; identical settings reuse the cached text."""
+    if cfg is None:
+        cfg = AUTONIGHT_CFG
+    return _status_text_values(
+        bool(cfg.get("enabled", True)),
+        cfg.get("start", "00:00"),
+        cfg.get("end", "06:00"),
+        cfg.get("tz", "Asia/Kolkata"),
+    )
+
+
+def autonight_parse_command(arg: str, cfg: dict) -> Tuple[str, dict]:
+    """
+    Returns (message_text, updated_cfg or same). The caller persists an
+    updated cfg (see _save_autonight); parsing itself does no I/O.
+    Supported:
+      .night
+      .night on | off
+      .night 23:00 to 07:00   (also supports -, – , —)
+      .night 23-7
+    """
+    arg = (arg or "").strip()
+    if not arg:
+        return (autonight_status_text(cfg), cfg)
+
+    low = arg.lower()
+    if low in {"on", "enable", "enabled"}:
+        cfg = cfg.copy()
+        cfg["enabled"] = True
+        return ("✅ Auto-Night **enabled**.\n" + autonight_status_text(cfg), cfg)
+
+    if low in {"off", "disable", "disabled"}:
+        cfg = cfg.copy()
+        cfg["enabled"] = False
+        return ("🚫 Auto-Night **disabled**.\n" + autonight_status_text(cfg), cfg)
+
+    # Time range
+    m = _RANGE_RE.fullmatch(arg)
+    if not m:
+        return (
+            "❗ Format: `.night 23:00 to 07:00`\n"
+            "Also works with a dash: `.night 23:00-07:00` (24-hour times).",
+            cfg
+        )
+
+    start_raw, end_raw = m.group(1), m.group(2)
+    try:
+        start_t = _parse_hhmm(start_raw)
+        end_t   = _parse_hhmm(end_raw)
+    except ValueError as e:
+        return (f"❗ {e}", cfg)
+
+    cfg = cfg.copy()
+    cfg["start"] = f"{start_t.hour:02d}:{start_t.minute:02d}"
+    cfg["end"]   = f"{end_t.hour:02d}:{end_t.minute:02d}"
+    return (f"🕒 Auto-Night window updated:\n**{cfg['start']} → {cfg['end']}** ({cfg.get('tz','Asia/Kolkata')})\n" + autonight_status_text(cfg), cfg)
+
+def _seconds_until_quiet_start(cfg: dict = None, now: Optional[datetime] = None) -> int:
+    if cfg is None:
+        cfg = AUTONIGHT_CFG
+    an = _compile_autonight(cfg)
+    if now is None:
+        now = _get_now_tz(an.tz)
+    return _seconds_until(now, an.start_min)
+
+# Global Auto-Night config (shared across accounts)
+AUTONIGHT_CFG = _load_autonight()
+
+def reload_autonight_cfg(cfg: dict = None) -> dict:
+    """Refresh AUTONIGHT_CFG in place so every holder of the dict sees CLI edits.
+
+    user_loader calls this only when the database has changed and the settings
+    it read off the event loop differ from the current ones.
+    """
+    if cfg is None:
+        cfg = _load_autonight()
+    AUTONIGHT_CFG.clear()
+    AUTONIGHT_CFG.update(cfg)
+    return AUTONIGHT_CFG
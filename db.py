@@ -4,19 +4,41 @@ import json
 import time
 from typing import Dict, List, Any, Optional
 
+try:
+    import orjson  # optional: faster encoding of the JSON columns
+except ImportError:
+    orjson = None
+
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_FILE = os.path.join(APP_DIR, "app_data.db")
+MAX_ERRORS_PER_USER = 15  # error log entries kept per account
+
+# Long-lived connection used only to watch for commits made by other connections
+_watch_conn: Optional[sqlite3.Connection] = None
+
+def _json_dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+def _json_loads(data: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 def get_db() -> sqlite3.Connection:
     conn = sqlite3.connect(DB_FILE, timeout=30.0)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA foreign_keys=ON;")
+    # Safe with WAL: a power loss can only drop the last commits, never corrupt
+    conn.execute("PRAGMA synchronous=NORMAL;")
     return conn
 
 def init_db():
     conn = get_db()
     try:
+        # WAL is persistent in the database file, so it only needs setting once
+        conn.execute("PRAGMA journal_mode=WAL;")
         cursor = conn.cursor()
         
         # Create users table
@@ -33,6 +55,8 @@ def init_db():
                 updated_at REAL DEFAULT 0.0
             );
         """)
+        # Covering index so the runner's change poll never reads full user rows
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_updated ON users(phone, updated_at);")
         
         # Create errors table
         cursor.execute("""
@@ -177,6 +201,30 @@ def migrate_old_json():
 
 # ---------- API functions for CLI and Runner ----------
 
+def enable_wal(path: str) -> None:
+    """
+    Switch an existing SQLite file (such as a Telethon .session) to WAL journaling.
+    The mode is stored in the file, so later connections opened by Telethon use it too.
+    """
+    if not os.path.exists(path):
+        return
+    conn = sqlite3.connect(path, timeout=30.0)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL;")
+    finally:
+        conn.close()
+
+def get_data_version() -> int:
+    """Return SQLite's PRAGMA data_version as seen by a dedicated connection.
+
+    The value changes whenever any other connection (this process or the CLI)
+    commits, so pollers can skip re-reading tables while it stays the same.
+    """
+    global _watch_conn
+    if _watch_conn is None:
+        _watch_conn = sqlite3.connect(DB_FILE, timeout=30.0, check_same_thread=False)
+    return _watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
 def get_users_dict() -> Dict[str, Dict[str, Any]]:
     conn = get_db()
     try:
@@ -241,7 +289,7 @@ def get_user_config(phone: str) -> Optional[Dict[str, Any]]:
             "api_hash": row["api_hash"],
             "cycle_delay_min": row["cycle_delay_min"],
             "msg_delay_sec": row["msg_delay_sec"],
-            "groups": json.loads(row["groups"] or "[]"),
+            "groups": _json_loads(row["groups"] or "[]"),
             "plan_expiry": row["plan_expiry"]
         }
     finally:
@@ -256,7 +304,7 @@ def update_user_config(phone: str, **kwargs):
         for key, val in kwargs.items():
             if val is not None:
                 if key == "groups":
-                    val = json.dumps(val)
+                    val = _json_dumps(val)
                 set_clauses.append(f"{key} = ?")
                 params.append(val)
         if not set_clauses:
@@ -271,6 +319,16 @@ def update_user_config(phone: str, **kwargs):
     finally:
         conn.close()
 
+def get_user_versions() -> Dict[str, float]:
+    """Return phone -> updated_at for all users, without loading their configs."""
+    conn = get_db()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT phone, updated_at FROM users")
+        return {row["phone"]: row["updated_at"] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
 def get_all_user_configs() -> List[Dict[str, Any]]:
     conn = get_db()
     try:
@@ -285,7 +343,7 @@ def get_all_user_configs() -> List[Dict[str, Any]]:
                 "api_hash": r["api_hash"],
                 "cycle_delay_min": r["cycle_delay_min"],
                 "msg_delay_sec": r["msg_delay_sec"],
-                "groups": json.loads(r["groups"] or "[]"),
+                "groups": _json_loads(r["groups"] or "[]"),
                 "plan_expiry": r["plan_expiry"],
                 "updated_at": r["updated_at"]
             }
@@ -301,7 +359,7 @@ def get_autonight_settings() -> Dict[str, Any]:
         cursor.execute("SELECT value FROM settings WHERE key = 'autonight'")
         row = cursor.fetchone()
         if row:
-            return json.loads(row["value"])
+            return _json_loads(row["value"])
         return {
             "enabled": True,
             "start": "00:00",
@@ -317,7 +375,7 @@ def save_autonight_settings(cfg: Dict[str, Any]):
         cursor = conn.cursor()
         cursor.execute(
             "INSERT OR REPLACE INTO settings (key, value) VALUES ('autonight', ?)",
-            (json.dumps(cfg),)
+            (_json_dumps(cfg),)
         )
         conn.commit()
     finally:
@@ -339,10 +397,10 @@ def log_error(phone: str, timestamp: str, message: str, details: Optional[str] =
                   SELECT id FROM errors 
                   WHERE phone = ? 
                   ORDER BY id DESC 
-                  LIMIT 15
+                  LIMIT ?
               )
             """,
-            (phone, phone)
+            (phone, phone, MAX_ERRORS_PER_USER)
         )
         conn.commit()
     finally:
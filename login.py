@@ -32,7 +32,7 @@ import re
 import json
 import tempfile
 import shutil
-from datetime import datetime, timedelta, time
+from datetime import datetime, timedelta
 from typing import Dict, Any
 
 try:
@@ -60,17 +60,15 @@ from colorama import Fore, Style, init
 # ---------- Init ----------
 init(autoreset=True)
 import db
+from autonight import _parse_hhmm
 
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 SESSIONS_DIR = os.path.join(APP_DIR, "sessions")
 PID_FILE = os.path.join(APP_DIR, "runner.pid")
 RUNNER_LOG = os.path.join(APP_DIR, "runner.log")
-AUTONIGHT_DEFAULT = {
-    "enabled": True,
-    "start": "00:00",
-    "end": "06:00",
-    "tz": "Asia/Kolkata"
-}
+
+# Input patterns, compiled once
+_PHONE_STRIP_RE = re.compile(r"[^\d+]")
 
 def atomic_save_json(path: str, data: Any) -> bool:
     """Save JSON data to a file atomically using a temporary file."""
@@ -247,21 +245,6 @@ def start_runner_if_needed():
 
 
 # ---------- Auto-Night editor ----------
-def _parse_hhmm(s: str) -> time:
-    s = s.strip()
-    if re.fullmatch(r"\d{1,2}", s):
-        h = int(s)
-        if not (0 <= h <= 23):
-            raise ValueError("Hour must be 0..23")
-        return time(h, 0)
-    m = re.fullmatch(r"(\d{1,2}):(\d{2})", s)
-    if not m:
-        raise ValueError("Time must be HH or HH:MM (24h)")
-    h, mm = int(m.group(1)), int(m.group(2))
-    if not (0 <= h <= 23 and 0 <= mm <= 59):
-        raise ValueError("Invalid time")
-    return time(h, mm)
-
 def show_autonight():
     cfg = db.get_autonight_settings()
     state = f"{Fore.GREEN}ACTIVE ✅" if cfg.get("enabled", True) else f"{Fore.RED}DISABLED ❌"
@@ -317,11 +300,12 @@ def login_new_user(users: Dict[str, Any]):
         print(Fore.RED + "  [!] API ID must be numeric.")
         return
 
-    phone = re.sub(r'[^\d+]', '', phone_raw)
+    phone = _PHONE_STRIP_RE.sub('', phone_raw)
 
     session_path = os.path.join(SESSIONS_DIR, f"{phone}.session")
     client = TelegramClient(session_path, int(api_id), api_hash)
 
+    logged_in = False
     try:
         client.connect()
         if not client.is_user_authorized():
@@ -356,19 +340,27 @@ def login_new_user(users: Dict[str, Any]):
         users[phone] = {"name": name or user_display, "api_id": int(api_id), "api_hash": api_hash}
         save_users(users)
         save_user_config(phone, users[phone])
+        logged_in = True
 
     finally:
         client.disconnect()
 
+    # A running engine picks the new account up from the database by itself;
+    # only make sure there is one, instead of restarting it for every login
+    if logged_in:
+        start_runner_if_needed()
+
 def delete_user(users: Dict[str, Any]):
     phone = input("  Phone number to delete: ").strip()
     if phone in users:
         session_file = os.path.join(SESSIONS_DIR, f"{phone}.session")
-        if os.path.exists(session_file):
-            try:
-                os.remove(session_file)
-            except Exception:
-                pass
+        # WAL-mode sessions leave -wal/-shm side files next to the database
+        for path in (session_file, session_file + "-wal", session_file + "-shm"):
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except Exception:
+                    pass
         db.delete_user(phone)
         print(Fore.RED + f"  [✖] Account {phone} removed.")
     else:
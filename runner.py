@@ -30,15 +30,18 @@ if missing_packages:
 
 import json
 import asyncio
+import collections
 import logging
+import queue
 import sqlite3
 import re
 import random
 import signal
 import tempfile
 import shutil
-from datetime import datetime, date, time, timedelta
-from typing import Tuple, List, Optional, Any
+from datetime import date, timedelta
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional, Any
 
 try:
     sys.stdout.reconfigure(encoding='utf-8')
@@ -47,9 +50,9 @@ except AttributeError:
     pass
 
 try:
-    from zoneinfo import ZoneInfo  # Python 3.9+
-except Exception:
-    ZoneInfo = None  # will fall back to local time without TZ
+    import uvloop  # optional faster event loop (not available on Windows)
+except ImportError:
+    uvloop = None
 
 from telethon import TelegramClient, events
 from telethon.errors import (
@@ -64,60 +67,27 @@ from colorama import Fore, Style, init
 
 init(autoreset=True)
 import db
+from autonight import (
+    AUTONIGHT_CFG,
+    DEFAULT_AUTONIGHT,
+    _compile_autonight,
+    _get_now_tz,
+    _load_autonight,
+    _save_autonight,
+    _seconds_until_quiet_end,
+    _seconds_until_quiet_start,
+    autonight_is_quiet,
+    autonight_parse_command,
+    autonight_status_text,
+    reload_autonight_cfg,
+)
 
+# Patterns used by the command handlers, compiled once
+_NUM_RE = re.compile(r"\d+")
+_LINK_SPLIT_RE = re.compile(r"[\s,\n]+")
+_TME_LINK_RE = re.compile(r"^https?://(?:t\.me|telegram\.me)/\S+$")
+_CMD_PREFIX_RE = re.compile(r"\s*\.")
 
-# =========================
-# Auto-Night configuration
-# =========================
-DEFAULT_AUTONIGHT = {
-    "enabled": True,
-    "start": "00:00",        # 24h format HH:MM
-    "end": "06:00",          # 24h format HH:MM
-    "tz": "Asia/Kolkata"
-}
-
-
-
-
-def _load_autonight() -> dict:
-    return db.get_autonight_settings()
-
-def _save_autonight(cfg: dict) -> None:
-    db.save_autonight_settings(cfg)
-
-def _parse_hhmm(s: str) -> time:
-    s = s.strip()
-    # Accept "7", "07", "7:00", "07:00"
-    if re.fullmatch(r"\d{1,2}", s):
-        h = int(s)
-        if not (0 <= h <= 23):
-            raise ValueError("Hour must be 0..23")
-        return time(h, 0)
-    m = re.fullmatch(r"(\d{1,2}):(\d{2})", s)
-    if not m:
-        raise ValueError("Time must be HH or HH:MM (24h)")
-    h, mm = int(m.group(1)), int(m.group(2))
-    if not (0 <= h <= 23 and 0 <= mm <= 59):
-        raise ValueError("Invalid time")
-    return time(h, mm)
-
-def _get_now_tz(tz_name: str) -> datetime:
-    if not tz_name:
-        tz_name = "Asia/Kolkata"
-    if ZoneInfo is not None:
-        try:
-            return datetime.now(ZoneInfo(tz_name))
-        except Exception:
-            pass
-    # Fallback to timezone offset if we know it's India time
-    try:
-        from datetime import timezone, timedelta
-        if tz_name == "Asia/Kolkata":
-            return datetime.now(timezone(timedelta(hours=5, minutes=30)))
-    except Exception:
-        pass
-    # Fallback: naive local time
-    return datetime.now()
 
 def _get_cycle_seconds_with_jitter(cycle_min: float) -> int:
     if cycle_min in (7, 20):  # Both legacy default 20 and new default 7 map to 6-8 min (360-480s)
@@ -128,136 +98,52 @@ def _get_cycle_seconds_with_jitter(cycle_min: float) -> int:
         jitter = int(seconds * 0.15)
         return random.randint(seconds - jitter, seconds + jitter)
 
-def _in_window(now_t: time, start_t: time, end_t: time) -> bool:
-    """True if now is within [start, end) with midnight wrap support."""
-    if start_t <= end_t:
-        return start_t <= now_t < end_t
-    # crosses midnight, e.g., 23:00 -> 07:00
-    return (now_t >= start_t) or (now_t < end_t)
-
-def _seconds_until_quiet_end(cfg: dict = None) -> int:
-    """Return seconds until the end of quiet window (>= 1), assuming we are currently in quiet."""
-    if cfg is None or cfg is AUTONIGHT_CFG:
-        cfg = reload_autonight_cfg()
-    tz = cfg.get("tz") or DEFAULT_AUTONIGHT["tz"]
-    now = _get_now_tz(tz)
-    start_t = _parse_hhmm(cfg.get("start", DEFAULT_AUTONIGHT["start"]))
-    end_t   = _parse_hhmm(cfg.get("end", DEFAULT_AUTONIGHT["end"]))
-    today = now.date()
-
-    # Compute next end datetime
-    if start_t <= end_t:
-        # non-wrapping window (e.g., 02:00 -> 05:00)
-        end_dt = datetime.combine(today, end_t, tzinfo=now.tzinfo)
-        if now.time() >= end_t:
-            end_dt = end_dt + timedelta(days=1)
-    else:
-        # wrapping window (e.g., 23:00 -> 07:00)
-        if now.time() < end_t:
-            end_dt = datetime.combine(today, end_t, tzinfo=now.tzinfo)
-        else:
-            end_dt = datetime.combine(today + timedelta(days=1), end_t, tzinfo=now.tzinfo)
-
-    seconds = int((end_dt - now).total_seconds())
-    return max(1, seconds)
-
-def autonight_is_quiet(cfg: dict = None) -> bool:
-    if cfg is None or cfg is AUTONIGHT_CFG:
-        cfg = reload_autonight_cfg()
-    if not cfg.get("enabled", True):
-        return False
-    try:
-        now = _get_now_tz(cfg.get("tz", DEFAULT_AUTONIGHT["tz"]))
-        start_t = _parse_hhmm(cfg.get("start", DEFAULT_AUTONIGHT["start"]))
-        end_t   = _parse_hhmm(cfg.get("end", DEFAULT_AUTONIGHT["end"]))
-        return _in_window(now.time(), start_t, end_t)
-    except Exception:
-        # Fail open if config broken
-        return False
-
-def autonight_status_text(cfg: dict = None) -> str:
-    if cfg is None or cfg is AUTONIGHT_CFG:
-        cfg = reload_autonight_cfg()
-    state = "ACTIVE ✅" if cfg.get("enabled", True) else "DISABLED ❌"
-    return (
-        f"🌙 Auto-Night: **{state}**\n"
-        f"Window: **{cfg.get('start','00:00')} → {cfg.get('end','06:00')}**\n"
-        f"TZ: **{cfg.get('tz','Asia/Kolkata')}**"
-    )
-
-
-def autonight_parse_command(arg: str, cfg: dict) -> Tuple[str, dict]:
-    """
-    Returns (message_text, updated_cfg or same).
-    Supported:
-      .night
-      .night on | off
-      .night 23:00 to 07:00   (also supports -, – , —)
-      .night 23-7
-    """
-    arg = (arg or "").strip()
-    if not arg:
-        return (autonight_status_text(cfg), cfg)
-
-    low = arg.lower()
-    if low in {"on", "enable", "enabled"}:
-        cfg = cfg.copy()
-        cfg["enabled"] = True
-        _save_autonight(cfg)
-        return ("✅ Auto-Night **enabled**.\n" + autonight_status_text(cfg), cfg)
-
-    if low in {"off", "disable", "disabled"}:
-        cfg = cfg.copy()
-        cfg["enabled"] = False
-        _save_autonight(cfg)
-        return ("🚫 Auto-Night **disabled**.\n" + autonight_status_text(cfg), cfg)
-
-    # Time range
-    m = re.fullmatch(
-        r"\s*(\d{1,2}(?::\d{2})?)\s*(?:to|–|—|-)\s*(\d{1,2}(?::\d{2})?)\s*",
-        arg
-    )
-    if not m:
-        return (
-            "❗ Format: `.night 23:00 to 07:00`\n"
-            "Also works with a dash: `.night 23:00-07:00` (24-hour times).",
-            cfg
-        )
-
-    start_raw, end_raw = m.group(1), m.group(2)
-    try:
-        start_t = _parse_hhmm(start_raw)
-        end_t   = _parse_hhmm(end_raw)
-    except ValueError as e:
-        return (f"❗ {e}", cfg)
-
-    cfg = cfg.copy()
-    cfg["start"] = f"{start_t.hour:02d}:{start_t.minute:02d}"
-    cfg["end"]   = f"{end_t.hour:02d}:{end_t.minute:02d}"
-    _save_autonight(cfg)
-    return (f"🕒 Auto-Night window updated:\n**{cfg['start']} → {cfg['end']}** ({cfg.get('tz','Asia/Kolkata')})\n" + autonight_status_text(cfg), cfg)
 
 # =========================
 # Original forwarder logic
 # =========================
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Setup logging: records are queued and written by a background listener
+# thread so a slow stderr/runner.log write never stalls the event loop.
+# basicConfig installs the usual format on the QueueHandler, which renders
+# records before queueing them; the listener's handler then writes them as-is.
+_log_queue = queue.SimpleQueue()
+log_listener = QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
 logger = logging.getLogger(__name__)
+log_listener.start()
 
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 SESSIONS_DIR = os.path.join(APP_DIR, "sessions")
 PID_FILE = os.path.join(APP_DIR, "runner.pid")
-clients = {}
-started_phones = set()
-active_bots = {}
+LOADER_POLL_SEC = 1           # database change check interval
+LOADER_FALLBACK_SEC = 10      # reload interval if change detection is unavailable
+CONFIG_FLUSH_DELAY = 0.2      # seconds to coalesce settings writes from commands
+RESOLVE_CONCURRENCY = 8       # parallel entity lookups per bot
+SAVED_CACHE_LIMIT = 100        # Saved Messages considered per cycle
+SAVED_FULL_REFRESH_SEC = 1800  # re-fetch the whole window to pick up edits/deletions
+JOIN_FLOODWAIT_MAX = 300       # longer join FloodWaits end the .join session instead of waiting
+ERROR_BACKOFF_BASE = 60        # first forward-loop retry after an unexpected error
+ERROR_BACKOFF_MAX = 900        # cap for the doubling retry delay
+active_bots = {}  # phone -> {"client", "state", "config"} of connected bots
+bot_tasks = {}    # phone -> run_user_bot task; the single source of truth for "started"
+
+def _report_background_db_error(fut) -> None:
+    """Done-callback for fire-and-forget database writes, so failures are not silently dropped."""
+    if not fut.cancelled() and fut.exception() is not None:
+        logger.error("Background database write failed: %s", fut.exception())
+
+def wake_bots() -> None:
+    """Interrupt every bot's current sleep so it re-reads timing and Auto-Night settings."""
+    for bot in active_bots.values():
+        bot["state"]["wake"].set()
 
 def extract_and_normalize_links(text: str) -> List[str]:
     """
     Extracts and normalizes Telegram group links or usernames from a string.
     Handles spaces, commas, and newlines. Normalizes '@username' and 't.me/...'
     """
-    tokens = re.split(r'[\s,\n]+', text)
+    tokens = _LINK_SPLIT_RE.split(text)
     links = []
     for token in tokens:
         token = token.strip()
@@ -269,7 +155,7 @@ def extract_and_normalize_links(text: str) -> List[str]:
             links.append(f"https://{token}")
         elif token.startswith('telegram.me/'):
             links.append(f"https://{token}")
-        elif re.match(r'^https?://(?:t\.me|telegram\.me)/\S+$', token):
+        elif _TME_LINK_RE.match(token):
             links.append(token)
     return links
 
@@ -283,17 +169,6 @@ def format_seconds(seconds: int) -> str:
     parts.append(f"{s}s")
     return " ".join(parts)
 
-def _seconds_until_quiet_start(cfg: dict = None) -> int:
-    if cfg is None or cfg is AUTONIGHT_CFG:
-        cfg = reload_autonight_cfg()
-    tz = cfg.get("tz") or DEFAULT_AUTONIGHT["tz"]
-    now = _get_now_tz(tz)
-    start_t = _parse_hhmm(cfg.get("start", DEFAULT_AUTONIGHT["start"]))
-    today = now.date()
-    start_dt = datetime.combine(today, start_t, tzinfo=now.tzinfo)
-    if now.time() >= start_t:
-        start_dt = start_dt + timedelta(days=1)
-    return int((start_dt - now).total_seconds())
 
 async def check_write_permission(client, entity) -> str:
     try:
@@ -319,9 +194,11 @@ async def check_write_permission(client, entity) -> str:
     except Exception as e:
         return f"Access Denied: {type(e).__name__}"
 
-async def resolve_group_entity(client, group_url: str):
+async def resolve_group_entity(client, group_url: str, input_peer: bool = False):
     """
     Resolves a group URL (public or private invite link) to a Telethon entity.
+    With input_peer=True only the InputPeer needed for sending is returned, which
+    Telethon can usually answer from the session's entity cache without an RPC.
     """
     clean_link = group_url.strip().rstrip('/')
     
@@ -337,18 +214,44 @@ async def resolve_group_entity(client, group_url: str):
         try:
             res = await client(CheckChatInviteRequest(hash_val))
             if isinstance(res, ChatInviteAlready) and res.chat:
-                return res.chat
+                return tel_utils.get_input_peer(res.chat) if input_peer else res.chat
         except Exception as e:
-            logger.error(f"Error checking chat invite for {group_url}: {e}")
+            logger.error("Error checking chat invite for %s: %s", group_url, e)
             
     # Try to resolve via client.get_entity() directly
     try:
+        if input_peer:
+            return await client.get_input_entity(clean_link)
         return await client.get_entity(clean_link)
     except Exception as e:
-        logger.error(f"Failed to get entity for {group_url}: {e}")
+        logger.error("Failed to get entity for %s: %s", group_url, e)
         return group_url
 
-async def interruptible_sleep(get_target_time, tz_name: str):
+async def resolve_group_entities(client, groups) -> list:
+    """
+    Resolves several group URLs to InputPeers for sending, concurrently (at most
+    RESOLVE_CONCURRENCY in flight), returning results in the same order as `groups`.
+    """
+    sem = asyncio.Semaphore(RESOLVE_CONCURRENCY)
+
+    async def _resolve(group_url):
+        async with sem:
+            return await resolve_group_entity(client, group_url, input_peer=True)
+
+    return await asyncio.gather(*(_resolve(g) for g in groups))
+
+async def sleep_or_wake(wake: Optional[asyncio.Event], seconds: float) -> None:
+    """Sleep for `seconds`, returning early if `wake` is set meanwhile."""
+    if wake is None:
+        await asyncio.sleep(seconds)
+        return
+    wake.clear()
+    try:
+        await asyncio.wait_for(wake.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+async def interruptible_sleep(get_target_time, tz_name: str, wake: Optional[asyncio.Event] = None):
     while True:
         target = get_target_time()
         if not target:
@@ -359,33 +262,31 @@ async def interruptible_sleep(get_target_time, tz_name: str):
         rem = (target - now).total_seconds()
         if rem <= 0:
             break
-        # Sleep at most 1 second to remain highly responsive
-        await asyncio.sleep(min(rem, 1.0))
-
-# Global Auto-Night config (shared across accounts)
-AUTONIGHT_CFG = _load_autonight()
+        if wake is None:
+            # Sleep at most 1 second to remain highly responsive
+            await asyncio.sleep(min(rem, 1.0))
+        else:
+            # Sleep until the target, or until a command moves it
+            await sleep_or_wake(wake, rem)
 
-def reload_autonight_cfg() -> dict:
-    global AUTONIGHT_CFG
-    AUTONIGHT_CFG = _load_autonight()
-    return AUTONIGHT_CFG
 
 async def run_user_bot(config):
+    # Started only from user_loader, which keeps one live task per phone in bot_tasks
     phone = config["phone"]
-    if phone in started_phones:
-        return
-
-    # Track this session to avoid concurrent start attempts
-    started_phones.add(phone)
-
     session_path = os.path.join(SESSIONS_DIR, f"{phone}.session")
     api_id = int(config["api_id"])
     api_hash = config["api_hash"]
     delay = config.get("msg_delay_sec", 20)
     cycle = config.get("cycle_delay_min", 7)
 
+    # WAL lets the CLI's health check read the session while this client writes to it
+    try:
+        await asyncio.to_thread(db.enable_wal, session_path)
+    except Exception as e:
+        logger.warning("[%s] Could not enable WAL on session file: %s", phone, e)
+
     # Load persistent errors
-    loaded_errors = db.get_errors(phone)
+    loaded_errors = await asyncio.to_thread(db.get_errors, phone)
 
     user_state = {
         "delay": delay,   # seconds between forwards
@@ -396,10 +297,15 @@ async def run_user_bot(config):
         "current_cycle_success": 0,
         "current_cycle_fail": 0,
         "next_msg_at": None,
+        "wake": asyncio.Event(),  # set to cut the forward loop's current sleep short
+        "groups_version": 0,  # bumped whenever config["groups"] is mutated
+        "saved_cache": None,  # Saved Messages, newest first (None = fetch fully)
+        "saved_max_id": 0,
+        "saved_fetched_at": 0.0,
         "status": "Idle 😴",
         "logs": [],
         "errors": loaded_errors,
-        "start_time": _get_now_tz(reload_autonight_cfg().get("tz", DEFAULT_AUTONIGHT["tz"]))
+        "start_time": _get_now_tz(AUTONIGHT_CFG.get("tz", DEFAULT_AUTONIGHT["tz"]))
     }
 
     active_bots[phone] = {
@@ -409,7 +315,7 @@ async def run_user_bot(config):
     }
 
     def log_event(msg, details=None):
-        tz = reload_autonight_cfg().get("tz", DEFAULT_AUTONIGHT["tz"])
+        tz = AUTONIGHT_CFG.get("tz", DEFAULT_AUTONIGHT["tz"])
         now = _get_now_tz(tz)
         ts = now.strftime("%H:%M:%S")
         
@@ -438,32 +344,132 @@ async def run_user_bot(config):
             user_state["logs"].pop(0)
             
         if is_err:
-            db.log_error(phone, ts, msg, details)
-            user_state["errors"] = db.get_errors(phone)
-        logger.info(f"[{phone}] {msg}")
+            # The INSERT runs on a worker thread; the in-memory list below is what commands read
+            fut = asyncio.get_running_loop().run_in_executor(None, db.log_error, phone, ts, msg, details)
+            fut.add_done_callback(_report_background_db_error)
+            # Mirror the table's trimming in memory instead of reading it back
+            errors = user_state["errors"]
+            errors.append({"timestamp": ts, "message": msg, "details": details})
+            del errors[:-db.MAX_ERRORS_PER_USER]
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] %s", phone, msg)
 
     client = TelegramClient(session_path, api_id, api_hash)
     active_bots[phone]["client"] = client
+    ready = False
     try:
         await client.connect()
         if not await client.is_user_authorized():
-            logger.error(f"[{phone}] Session revoked or unauthorized.")
-            return
-
-        me = await client.get_me()
-        me_id = me.id
-        log_event(f"Bot connected: {config.get('name','N/A')} (ID: {me_id})")
+            logger.error("[%s] Session revoked or unauthorized.", phone)
+        else:
+            me = await client.get_me()
+            me_id = me.id
+            log_event(f"Bot connected: {config.get('name','N/A')} (ID: {me_id})")
+            ready = True
     except Exception as e:
-        logger.error(f"[{phone}] Connection failure: {e}")
+        logger.error("[%s] Connection failure: %s", phone, e)
+    finally:
+        if not ready:
+            # Release this account only, also when cancelled mid-connect; other bots keep running
+            active_bots.pop(phone, None)
+            try:
+                await client.disconnect()
+            except Exception:
+                pass
+    if not ready:
         return
 
 
+    async def fetch_saved_messages():
+        """
+        Return the latest Saved Messages (newest first). After the first fetch the
+        cache is kept current by the Saved Messages event handlers below; the full
+        re-fetch every SAVED_FULL_REFRESH_SEC covers updates missed while offline.
+        """
+        loop_now = asyncio.get_running_loop().time()
+        cache = user_state["saved_cache"]
+        if cache is None or loop_now - user_state["saved_fetched_at"] >= SAVED_FULL_REFRESH_SEC:
+            cache = collections.deque(
+                await client.get_messages("me", limit=SAVED_CACHE_LIMIT), maxlen=SAVED_CACHE_LIMIT
+            )
+            user_state["saved_fetched_at"] = loop_now
+            user_state["saved_cache"] = cache
+            user_state["saved_max_id"] = cache[0].id if cache else 0
+        return cache
+
+    @client.on(events.NewMessage(chats="me"))
+    async def saved_new_handler(event):
+        cache = user_state["saved_cache"]
+        if cache is None or event.message.id <= user_state["saved_max_id"]:
+            return
+        # Our own commands are deleted shortly after; never queue them for forwarding
+        if event.message.out and _CMD_PREFIX_RE.match(event.raw_text or ""):
+            return
+        # maxlen drops the oldest message off the other end
+        cache.appendleft(event.message)
+        user_state["saved_max_id"] = event.message.id
+
+    @client.on(events.MessageEdited(chats="me"))
+    async def saved_edit_handler(event):
+        cache = user_state["saved_cache"]
+        if not cache:
+            return
+        for idx, m in enumerate(cache):
+            if m.id == event.message.id:
+                cache[idx] = event.message
+                break
+
+    @client.on(events.MessageDeleted())
+    async def saved_delete_handler(event):
+        # Private-chat deletions carry no chat id, but their message ids are
+        # unique per account, so matching ids always belong to Saved Messages.
+        # Channel deletions use their own id space and are ignored.
+        cache = user_state["saved_cache"]
+        if not cache or event.chat_id is not None:
+            return
+        deleted = set(event.deleted_ids)
+        if any(m.id in deleted for m in cache):
+            user_state["saved_cache"] = collections.deque(
+                (m for m in cache if m.id not in deleted), maxlen=SAVED_CACHE_LIMIT
+            )
+
+    # Settings writes are coalesced: a burst of commands becomes one UPDATE
+    pending_config = {}
+    flush_task = None
+
+    async def flush_config(delay=CONFIG_FLUSH_DELAY):
+        nonlocal pending_config, flush_task
+        await asyncio.sleep(delay)
+        fields, pending_config = pending_config, {}
+        flush_task = None
+        if not fields:
+            return
+        try:
+            await asyncio.to_thread(db.update_user_config, phone, **fields)
+        except Exception as e:
+            logger.error("[%s] Failed to save settings %s: %s", phone, list(fields), e)
+
+    def schedule_config_save(**fields):
+        """Queue column updates for this user; they are written together shortly after."""
+        nonlocal flush_task
+        pending_config.update(fields)
+        if flush_task is None:
+            flush_task = asyncio.create_task(flush_config())
+
     async def delayed_delete(chat_id, msg_ids, delay=40):
         await asyncio.sleep(delay)
         try:
             await client.delete_messages(chat_id, msg_ids)
         except Exception:
-            pass
+            return
+        # Do not wait for a MessageDeleted update, which may never arrive
+        cache = user_state["saved_cache"]
+        if cache and chat_id == me_id:
+            gone = set(msg_ids)
+            if any(m.id in gone for m in cache):
+                user_state["saved_cache"] = collections.deque(
+                    (m for m in cache if m.id not in gone), maxlen=SAVED_CACHE_LIMIT
+                )
 
     def command_wrapper(func):
         async def wrapper(event):
@@ -472,282 +478,277 @@ async def run_user_bot(config):
             except Exception as e:
                 import traceback
                 tb_str = traceback.format_exc()
-                logger.error(f"Error in command handler: {e}", exc_info=True)
+                logger.error("Error in command handler: %s", e, exc_info=True)
                 log_event(f"Command Error: {type(e).__name__} - {e}", details=tb_str)
         return wrapper
 
-    @client.on(events.NewMessage(outgoing=True))
-    @command_wrapper
-    async def command_handler(event):
-        text = (event.raw_text or "").strip()
-        if not text.startswith("."):
+    async def cmd_time(event, text, now):
+        m = _NUM_RE.search(text)
+        value = int(m.group(0)) if m else 0
+        if value <= 0:
+            await event.respond("❗ Usage: `.time 7m` or `.time 1h`")
             return
-
-        # Setup auto-delete for command and its responses
-        orig_respond = event.respond
-        async def auto_delete_respond(*args, **kwargs):
-            resp = await orig_respond(*args, **kwargs)
-            if resp:
-                asyncio.create_task(delayed_delete(event.chat_id, [event.id, resp.id]))
-            return resp
-        event.respond = auto_delete_respond
-
-        # Ensure command itself is deleted after 40s even if no respond() is called
-        asyncio.create_task(delayed_delete(event.chat_id, [event.id]))
-
-        if text.startswith(".time"):
-            value = int(''.join(filter(str.isdigit, text)) or "0")
-            if value <= 0:
-                await event.respond("❗ Usage: `.time 7m` or `.time 1h`")
-                return
-            if 'h' in text.lower():
-                value = value * 60
-            
-            if value < 5:
-                await event.respond("⚠️ Minimum cycle interval is **5 minutes**. Setting to 5m.")
-                value = 5
-                
-            user_state["cycle"] = value
-            config["cycle_delay_min"] = value
-            db.update_user_config(phone, cycle_delay_min=value)
-            
-            tz = AUTONIGHT_CFG.get("tz", DEFAULT_AUTONIGHT["tz"])
-            sleep_seconds = _get_cycle_seconds_with_jitter(value)
-            user_state["next_msg_at"] = _get_now_tz(tz) + timedelta(seconds=sleep_seconds)
-            await event.respond(f"✅ Cycle delay set to **{value} minutes**")
-
-        elif text.startswith(".delay"):
-            value = int(''.join(filter(str.isdigit, text)) or "0")
-            if value <= 0:
-                await event.respond("❗ Usage: `.delay 30` (seconds)")
-                return
+        if 'h' in text.lower():
+            value = value * 60
+        
+        if value < 5:
+            await event.respond("⚠️ Minimum cycle interval is **5 minutes**. Setting to 5m.")
+            value = 5
             
-            if value < 10:
-                await event.respond("⚠️ Minimum message delay is **10 seconds**. Setting to 10s.")
-                value = 10
-                
-            user_state["delay"] = value
-            config["msg_delay_sec"] = value
-            db.update_user_config(phone, msg_delay_sec=value)
+        user_state["cycle"] = value
+        config["cycle_delay_min"] = value
+        schedule_config_save(cycle_delay_min=value)
+        
+        sleep_seconds = _get_cycle_seconds_with_jitter(value)
+        user_state["next_msg_at"] = now + timedelta(seconds=sleep_seconds)
+        user_state["wake"].set()
+        await event.respond(f"✅ Cycle delay set to **{value} minutes**")
+
+    async def cmd_delay(event, text, now):
+        m = _NUM_RE.search(text)
+        value = int(m.group(0)) if m else 0
+        if value <= 0:
+            await event.respond("❗ Usage: `.delay 30` (seconds)")
+            return
+        
+        if value < 10:
+            await event.respond("⚠️ Minimum message delay is **10 seconds**. Setting to 10s.")
+            value = 10
             
-            tz = AUTONIGHT_CFG.get("tz", DEFAULT_AUTONIGHT["tz"])
-            user_state["next_msg_at"] = _get_now_tz(tz) + timedelta(seconds=value)
-            await event.respond(f"✅ Message delay set to **{value} seconds** (Randomized ±15%)")
-
+        user_state["delay"] = value
+        config["msg_delay_sec"] = value
+        schedule_config_save(msg_delay_sec=value)
+        
+        user_state["next_msg_at"] = now + timedelta(seconds=value)
+        user_state["wake"].set()
+        await event.respond(f"✅ Message delay set to **{value} seconds** (Randomized ±15%)")
+
+    async def cmd_status(event, text, now):
+        quiet_countdown = ""
+        if AUTONIGHT_CFG.get("enabled", True):
+            if autonight_is_quiet(AUTONIGHT_CFG, now):
+                rem = _seconds_until_quiet_end(AUTONIGHT_CFG, now)
+                quiet_countdown = f"\n🌙 **Quiet Hours Active** (Ends in `{format_seconds(rem)}`)"
+            else:
+                rem = _seconds_until_quiet_start(AUTONIGHT_CFG, now)
+                quiet_countdown = f"\n🌙 **Next Quiet Period**: In `{format_seconds(rem)}`"
+        
+        next_msg_str = "N/A"
+        if user_state["next_msg_at"]:
+            next_msg_str = user_state["next_msg_at"].strftime("%H:%M:%S")
+
+        reply = (
+            f"⚙️ **System Status Panel**\n"
+            f"━━━━━━━━━━━━━━━━━━\n"
+            f"🔄 **Current State:** `{user_state['status']}`\n"
+            f"📍 **Target Groups:** `{len(config.setdefault('groups', []))}`\n"
+            f"🕒 **Next Action at:** `{next_msg_str}`\n"
+            f"━━━━━━━━━━━━━━━━━━\n"
+            f"⏱ **Cycle Interval:** `{user_state['cycle']} min` (±15% jitter)\n"
+            f"Spacing: `{user_state['delay']} sec` (between groups)\n"
+            f"Mode: `{'Copy' if user_state['use_copy'] else 'Forward'}`\n"
+            f"━━━━━━━━━━━━━━━━━━"
+            + quiet_countdown
+        )
+        await event.respond(reply)
 
-        elif text.startswith(".status"):
-            tz = AUTONIGHT_CFG.get("tz", DEFAULT_AUTONIGHT["tz"])
-            now = _get_now_tz(tz)
-            quiet_countdown = ""
-            if AUTONIGHT_CFG.get("enabled", True):
-                if autonight_is_quiet(AUTONIGHT_CFG):
-                    rem = _seconds_until_quiet_end(AUTONIGHT_CFG)
-                    quiet_countdown = f"\n🌙 **Quiet Hours Active** (Ends in `{format_seconds(rem)}`)"
-                else:
-                    rem = _seconds_until_quiet_start(AUTONIGHT_CFG)
-                    quiet_countdown = f"\n🌙 **Next Quiet Period**: In `{format_seconds(rem)}`"
-            
-            next_msg_str = "N/A"
-            if user_state["next_msg_at"]:
-                next_msg_str = user_state["next_msg_at"].strftime("%H:%M:%S")
-
-            reply = (
-                f"⚙️ **System Status Panel**\n"
-                f"━━━━━━━━━━━━━━━━━━\n"
-                f"🔄 **Current State:** `{user_state['status']}`\n"
-                f"📍 **Target Groups:** `{len(config.setdefault('groups', []))}`\n"
-                f"🕒 **Next Action at:** `{next_msg_str}`\n"
-                f"━━━━━━━━━━━━━━━━━━\n"
-                f"⏱ **Cycle Interval:** `{user_state['cycle']} min` (±15% jitter)\n"
-                f"Spacing: `{user_state['delay']} sec` (between groups)\n"
-                f"Mode: `{'Copy' if user_state['use_copy'] else 'Forward'}`\n"
-                f"━━━━━━━━━━━━━━━━━━"
-                + quiet_countdown
-            )
-            await event.respond(reply)
+    async def cmd_stats(event, text, now):
+        uptime = str(now - user_state["start_time"]).split('.')[0]
+        
+        # Performance Metrics
+        elapsed_seconds = (now - user_state["start_time"]).total_seconds()
+        total_sends = user_state["success_total"] + user_state["fail_total"]
+        sends_per_hour = (total_sends / (elapsed_seconds / 3600)) if elapsed_seconds > 0 else 0.0
+        
+        # Formatting next delivery time
+        next_msg_str = "N/A"
+        if user_state["next_msg_at"]:
+            next_msg_str = user_state["next_msg_at"].strftime("%H:%M:%S")
+        
+        # Label change based on status
+        next_label = "🕒 Next Delivery"
+        if "Idle" in user_state["status"] or "Waiting" in user_state["status"]:
+            next_label = "🕒 Next Cycle"
+        elif "Msg" in user_state["status"]:
+            next_label = "🕒 Next Group"
+
+        quiet_countdown = ""
+        if AUTONIGHT_CFG.get("enabled", True):
+            if autonight_is_quiet(AUTONIGHT_CFG, now):
+                rem = _seconds_until_quiet_end(AUTONIGHT_CFG, now)
+                quiet_countdown = f"🌙 **Quiet Mode**: Ends in `{format_seconds(rem)}`"
+            else:
+                rem = _seconds_until_quiet_start(AUTONIGHT_CFG, now)
+                quiet_countdown = f"🌙 **Next Quiet**: In `{format_seconds(rem)}`"
 
-        elif text.startswith(".stats"):
-            tz = AUTONIGHT_CFG.get("tz", DEFAULT_AUTONIGHT["tz"])
-            now = _get_now_tz(tz)
-            uptime = str(now - user_state["start_time"]).split('.')[0]
-            
-            # Performance Metrics
-            elapsed_seconds = (now - user_state["start_time"]).total_seconds()
-            total_sends = user_state["success_total"] + user_state["fail_total"]
-            sends_per_hour = (total_sends / (elapsed_seconds / 3600)) if elapsed_seconds > 0 else 0.0
-            
-            # Formatting next delivery time
-            next_msg_str = "N/A"
-            if user_state["next_msg_at"]:
-                next_msg_str = user_state["next_msg_at"].strftime("%H:%M:%S")
-            
-            # Label change based on status
-            next_label = "🕒 Next Delivery"
-            if "Idle" in user_state["status"] or "Waiting" in user_state["status"]:
-                next_label = "🕒 Next Cycle"
-            elif "Msg" in user_state["status"]:
-                next_label = "🕒 Next Group"
-
-            quiet_countdown = ""
-            if AUTONIGHT_CFG.get("enabled", True):
-                if autonight_is_quiet(AUTONIGHT_CFG):
-                    rem = _seconds_until_quiet_end(AUTONIGHT_CFG)
-                    quiet_countdown = f"🌙 **Quiet Mode**: Ends in `{format_seconds(rem)}`"
-                else:
-                    rem = _seconds_until_quiet_start(AUTONIGHT_CFG)
-                    quiet_countdown = f"🌙 **Next Quiet**: In `{format_seconds(rem)}`"
+        log_text = "\n".join(user_state["logs"][-5:]) if user_state["logs"] else "No logs yet."
+        
+        reply = (
+            f"📊 **System Statistics**\n"
+            f"━━━━━━━━━━━━━━━━━━\n"
+            f"👤 **Account:** {config.get('name')} ({phone})\n"
+            f"⏱ **Uptime:** `{uptime}`\n"
+            f"🔄 **Status:** {user_state['status']}\n"
+            f"📍 **Groups:** {len(config.setdefault('groups', []))}\n"
+            f"⚡ **Average Speed:** `{sends_per_hour:.1f} posts/hour`\n"
+            f"{quiet_countdown}\n"
+            f"━━━━━━━━━━━━━━━━━━\n"
+            f"✅ **Total Success:** `{user_state['success_total']}`\n"
+            f"❌ **Total Failed:** `{user_state['fail_total']}`\n"
+            f"{next_label}: `{next_msg_str}`\n"
+            f"━━━━━━━━━━━━━━━━━━\n"
+            f"📜 **Recent Logs:**\n`{log_text}`"
+        )
+        await event.respond(reply)
+
+    async def cmd_info(event, text, now):
+        expiry = "Lifetime"
+        reply = (
+            f"❀ User Info:\n"
+            f"❀ Name: {config.get('name')}\n"
+            f"❀ Cycle Delay: {user_state['cycle']} min\n"
+            f"❀ Message Delay: {user_state['delay']} sec\n"
+            f"❀ Groups: {len(config.setdefault('groups', []))}\n"
+            f"❀ Plan Access: {expiry}\n\n"
+            + autonight_status_text(AUTONIGHT_CFG)
+        )
 
-            log_text = "\n".join(user_state["logs"][-5:]) if user_state["logs"] else "No logs yet."
-            
-            reply = (
-                f"📊 **System Statistics**\n"
-                f"━━━━━━━━━━━━━━━━━━\n"
-                f"👤 **Account:** {config.get('name')} ({phone})\n"
-                f"⏱ **Uptime:** `{uptime}`\n"
-                f"🔄 **Status:** {user_state['status']}\n"
-                f"📍 **Groups:** {len(config.setdefault('groups', []))}\n"
-                f"⚡ **Average Speed:** `{sends_per_hour:.1f} posts/hour`\n"
-                f"{quiet_countdown}\n"
-                f"━━━━━━━━━━━━━━━━━━\n"
-                f"✅ **Total Success:** `{user_state['success_total']}`\n"
-                f"❌ **Total Failed:** `{user_state['fail_total']}`\n"
-                f"{next_label}: `{next_msg_str}`\n"
-                f"━━━━━━━━━━━━━━━━━━\n"
-                f"📜 **Recent Logs:**\n`{log_text}`"
-            )
-            await event.respond(reply)
+        await event.respond(reply)
 
-        elif text.startswith(".info"):
-            me = await client.get_me()
-            expiry = "Lifetime"
-            reply = (
-                f"❀ User Info:\n"
-                f"❀ Name: {config.get('name')}\n"
-                f"❀ Cycle Delay: {user_state['cycle']} min\n"
-                f"❀ Message Delay: {user_state['delay']} sec\n"
-                f"❀ Groups: {len(config.setdefault('groups', []))}\n"
-                f"❀ Plan Access: {expiry}\n\n"
-                + autonight_status_text(AUTONIGHT_CFG)
-            )
+    async def cmd_add(event, text, now):
+        cmd_arg = text[len(".addgroup"):].strip() if text.startswith(".addgroup") else text[len(".add"):].strip()
+        links = extract_and_normalize_links(cmd_arg)
+        if not links:
+            await event.respond("⚠️ No valid group links or usernames found.\nFormat: `.add @group1` or `.addgroup @group1, https://t.me/group2` or split by newlines.")
+            return
+        added, skipped = [], []
+        groups_list = config.setdefault("groups", [])
+        existing = set(groups_list)
+        for link in links:
+            if link not in existing:
+                existing.add(link)
+                groups_list.append(link)
+                added.append(link)
+            else:
+                skipped.append(link)
+        user_state["groups_version"] += 1
+        schedule_config_save(groups=list(groups_list))
+        msg = []
+        if added:
+            msg.append(f"✅ Added **{len(added)}** new group(s).")
+        if skipped:
+            msg.append(f"⚠️ Skipped **{len(skipped)}** duplicate(s).")
+        await event.respond("\n".join(msg) or "No changes.")
+
+    async def cmd_delall(event, text, now):
+        config["groups"] = []
+        user_state["groups_version"] += 1
+        schedule_config_save(groups=[])
+        await event.respond("🗑️ Target groups list cleared completely.")
+        return
 
-            await event.respond(reply)
-
-        elif text.startswith(".add"):
-            cmd_arg = text[len(".addgroup"):].strip() if text.startswith(".addgroup") else text[len(".add"):].strip()
-            links = extract_and_normalize_links(cmd_arg)
-            if not links:
-                await event.respond("⚠️ No valid group links or usernames found.\nFormat: `.add @group1` or `.addgroup @group1, https://t.me/group2` or split by newlines.")
-                return
-            added, skipped = [], []
-            groups_list = config.setdefault("groups", [])
-            for link in links:
-                if link not in groups_list:
-                    groups_list.append(link)
-                    added.append(link)
-                else:
-                    skipped.append(link)
-            db.update_user_config(phone, groups=groups_list)
-            msg = []
-            if added:
-                msg.append(f"✅ Added **{len(added)}** new group(s).")
-            if skipped:
-                msg.append(f"⚠️ Skipped **{len(skipped)}** duplicate(s).")
-            await event.respond("\n".join(msg) or "No changes.")
-
-        elif text.startswith(".delall"):
+    async def cmd_delgroup(event, text, now):
+        arg = text[len(".delgroup"):].strip().lower()
+        if arg == "all" or arg == "al":
             config["groups"] = []
-            db.update_user_config(phone, groups=[])
+            user_state["groups_version"] += 1
+            schedule_config_save(groups=[])
             await event.respond("🗑️ Target groups list cleared completely.")
             return
-
-        elif text.startswith(".delgroup"):
-            arg = text[len(".delgroup"):].strip().lower()
-            if arg == "all" or arg == "al":
-                config["groups"] = []
-                db.update_user_config(phone, groups=[])
-                await event.respond("🗑️ Target groups list cleared completely.")
-                return
-                
-            cmd_arg = text[len(".delgroup"):].strip()
-            links = extract_and_normalize_links(cmd_arg)
-            if not links:
-                await event.respond("⚠️ Usage: `.delgroup <link1> ...` or `.delgroup all` to clear list.")
-                return
-            removed, skipped = [], []
-            groups_list = config.setdefault("groups", [])
-            for link in links:
-                normalized_link = link.rstrip('/')
-                found = None
-                for g in groups_list:
-                    if g.rstrip('/') == normalized_link:
-                        found = g
-                        break
-                if found:
-                    groups_list.remove(found)
-                    removed.append(link)
-                else:
-                    skipped.append(link)
-            db.update_user_config(phone, groups=groups_list)
-            msg = []
-            if removed:
-                msg.append(f"✅ Removed **{len(removed)}** group(s).")
-            if skipped:
-                msg.append(f"⚠️ Skipped **{len(skipped)}** group(s) (not in list).")
-            await event.respond("\n".join(msg) or "No changes.")
-
-        elif text.startswith(".groups"):
-            groups_list = config.setdefault("groups", [])
-            if not groups_list:
-                await event.respond("📋 No groups configured.")
+            
+        cmd_arg = text[len(".delgroup"):].strip()
+        links = extract_and_normalize_links(cmd_arg)
+        if not links:
+            await event.respond("⚠️ Usage: `.delgroup <link1> ...` or `.delgroup all` to clear list.")
+            return
+        removed, skipped = [], []
+        groups_list = config.setdefault("groups", [])
+        existing = {g.rstrip('/') for g in groups_list}
+        to_remove = set()
+        for link in links:
+            normalized_link = link.rstrip('/')
+            if normalized_link in existing:
+                existing.discard(normalized_link)
+                to_remove.add(normalized_link)
+                removed.append(link)
             else:
-                lines = [f"❀ Groups ({len(groups_list)}):"]
-                for idx, g in enumerate(groups_list, 1):
-                    lines.append(f"{idx}. {g}")
-                
-                # Chunk sending to avoid Telegram MessageTooLongError
-                current_chunk = []
-                current_len = 0
-                for line in lines:
-                    if current_len + len(line) + 1 > 4000:
-                        await event.respond("\n".join(current_chunk))
-                        current_chunk = [line]
-                        current_len = len(line)
-                    else:
-                        current_chunk.append(line)
-                        current_len += len(line) + 1
-                if current_chunk:
+                skipped.append(link)
+        if to_remove:
+            groups_list[:] = [g for g in groups_list if g.rstrip('/') not in to_remove]
+        user_state["groups_version"] += 1
+        schedule_config_save(groups=list(groups_list))
+        msg = []
+        if removed:
+            msg.append(f"✅ Removed **{len(removed)}** group(s).")
+        if skipped:
+            msg.append(f"⚠️ Skipped **{len(skipped)}** group(s) (not in list).")
+        await event.respond("\n".join(msg) or "No changes.")
+
+    async def cmd_groups(event, text, now):
+        groups_list = config.setdefault("groups", [])
+        if not groups_list:
+            await event.respond("📋 No groups configured.")
+        else:
+            lines = [f"❀ Groups ({len(groups_list)}):"]
+            for idx, g in enumerate(groups_list, 1):
+                lines.append(f"{idx}. {g}")
+            
+            # Chunk sending to avoid Telegram MessageTooLongError
+            current_chunk = []
+            current_len = 0
+            for line in lines:
+                if current_len + len(line) + 1 > 4000:
                     await event.respond("\n".join(current_chunk))
+                    current_chunk = [line]
+                    current_len = len(line)
+                else:
+                    current_chunk.append(line)
+                    current_len += len(line) + 1
+            if current_chunk:
+                await event.respond("\n".join(current_chunk))
 
-        elif text.startswith(".night"):
-            # .night, .night on/off, .night 23:00 to 07:00
-            arg = text[6:].strip() if len(text) > 6 else ""
-            msg, new_cfg = autonight_parse_command(arg, AUTONIGHT_CFG)
-            # Update global config in memory
+    async def cmd_night(event, text, now):
+        # .night, .night on/off, .night 23:00 to 07:00
+        arg = text[6:].strip() if len(text) > 6 else ""
+        msg, new_cfg = autonight_parse_command(arg, AUTONIGHT_CFG)
+        if new_cfg is not AUTONIGHT_CFG:
+            # Persist off the event loop first, then update the shared config in memory
+            await asyncio.to_thread(_save_autonight, new_cfg)
             for k in list(AUTONIGHT_CFG.keys()):
                 AUTONIGHT_CFG[k] = new_cfg.get(k, AUTONIGHT_CFG[k])
-            await event.respond(msg)
+            wake_bots()
+        await event.respond(msg)
 
-        elif text.startswith(".mode"):
-            if "forward" in text.lower():
-                user_state["use_copy"] = False
-                await event.respond("✅ Mode set to **Forward** (will show 'Forwarded from...')")
-            else:
-                user_state["use_copy"] = True
-                await event.respond("✅ Mode set to **Copy** (looks like a fresh message)")
+    async def cmd_mode(event, text, now):
+        if "forward" in text.lower():
+            user_state["use_copy"] = False
+            await event.respond("✅ Mode set to **Forward** (will show 'Forwarded from...')")
+        else:
+            user_state["use_copy"] = True
+            await event.respond("✅ Mode set to **Copy** (looks like a fresh message)")
+
+    async def cmd_join(event, text, now):
+        cmd_arg = text[len(".join"):].strip()
+        links = extract_and_normalize_links(cmd_arg)
+        if not links:
+            await event.respond("⚠️ Usage: `.join <link1> <link2> ...` (supports usernames and invite links)")
+            return
+        
+        progress_msg = await event.respond(f"🔄 Preparing to join {len(links)} groups...")
 
+        async def show_progress(text):
+            # Edits are rate-limited too; a failed edit must not count against the join
+            try:
+                await progress_msg.edit(text)
+            except Exception:
+                pass
 
-        elif text.startswith(".join"):
-            cmd_arg = text[len(".join"):].strip()
-            links = extract_and_normalize_links(cmd_arg)
-            if not links:
-                await event.respond("⚠️ Usage: `.join <link1> <link2> ...` (supports usernames and invite links)")
-                return
-            
-            progress_msg = await event.respond(f"🔄 Preparing to join {len(links)} groups...")
-            success, fail = 0, 0
-            for idx, link in enumerate(links, 1):
+        success, fail = 0, 0
+        stopped = False
+        for idx, link in enumerate(links, 1):
+            for attempt in range(2):
+                await show_progress(f"⏳ **[{idx}/{len(links)}] Joining:** {link}\n*(Anti-Flood delay active)*")
                 try:
-                    await progress_msg.edit(f"⏳ **[{idx}/{len(links)}] Joining:** {link}\n*(Anti-Flood delay active)*")
                     clean_link = link.strip().rstrip('/')
                     if "t.me/+" in clean_link:
                         hash_val = clean_link.split('+')[-1]
@@ -762,128 +763,234 @@ async def run_user_bot(config):
                         from telethon.tl.functions.channels import JoinChannelRequest
                         await client(JoinChannelRequest(username))
                     success += 1
+                except FloodWaitError as e:
+                    if e.seconds > JOIN_FLOODWAIT_MAX:
+                        # Telegram wants us to stop joining for a long while; do not push it
+                        logger.error("[%s] Join FloodWait of %ss, stopping .join", phone, e.seconds)
+                        stopped = True
+                    elif attempt == 0:
+                        # Wait exactly as long as Telegram asks, then retry this link once
+                        await show_progress(f"⏳ **FloodWait:** retrying {link} in {e.seconds}s")
+                        await asyncio.sleep(e.seconds + 1)
+                        continue
+                    fail += 1
                 except Exception as e:
-                    logger.error(f"Join error {link}: {e}")
+                    logger.error("Join error %s: %s", link, e)
                     fail += 1
-                
-                if idx < len(links):
-                    await asyncio.sleep(random.randint(10, 20))
-            await progress_msg.edit(f"📊 **Join Session Complete!**\n━━━━━━━━━━━━━━━━━━\n✅ Successfully Joined: **{success}**\n❌ Failed / Already Joined: **{fail}**")
-
-        elif text.startswith(".check"):
-            groups_list = config.setdefault("groups", [])
-            if not groups_list:
-                await event.respond("📋 No groups configured to check.")
-                return
-            
-            progress_msg = await event.respond(f"🔍 Auditing permissions on {len(groups_list)} groups...")
-            results = []
-            for idx, group in enumerate(groups_list, 1):
+                break
+
+            if stopped:
+                fail += len(links) - idx
+                break
+            if idx < len(links):
+                await asyncio.sleep(random.randint(10, 20))
+        await progress_msg.edit(f"📊 **Join Session Complete!**\n━━━━━━━━━━━━━━━━━━\n✅ Successfully Joined: **{success}**\n❌ Failed / Already Joined: **{fail}**")
+
+    async def cmd_check(event, text, now):
+        groups_list = config.setdefault("groups", [])
+        if not groups_list:
+            await event.respond("📋 No groups configured to check.")
+            return
+        
+        progress_msg = await event.respond(f"🔍 Auditing permissions on {len(groups_list)} groups...")
+        # Read-only lookups, so audit several groups at once (nothing is sent to them)
+        sem = asyncio.Semaphore(RESOLVE_CONCURRENCY)
+
+        async def audit(idx, group):
+            async with sem:
                 try:
                     target_entity = await resolve_group_entity(client, group)
                     if isinstance(target_entity, str):
-                        results.append(f"{idx}. 🚫 **{group}** | Access Denied")
-                        continue
-                    
+                        return f"{idx}. 🚫 **{group}** | Access Denied"
+
                     status = await check_write_permission(client, target_entity)
                     if status == "Healthy":
-                        results.append(f"{idx}. ✅ **{target_entity.title}** | Healthy")
-                    else:
-                        results.append(f"{idx}. ⚠️ **{target_entity.title}** | {status}")
+                        return f"{idx}. ✅ **{target_entity.title}** | Healthy"
+                    return f"{idx}. ⚠️ **{target_entity.title}** | {status}"
                 except Exception as e:
-                    results.append(f"{idx}. ❓ **{group}** | Error: {type(e).__name__}")
-            
-            # Delete progress message safely
-            try:
-                await progress_msg.delete()
-            except Exception:
-                pass
+                    return f"{idx}. ❓ **{group}** | Error: {type(e).__name__}"
 
-            # Send chunked responses
-            current_chunk = ["📊 **Group Health Report**", "━━━━━━━━━━━━━━━━━━"]
-            current_len = sum(len(line) for line in current_chunk)
-            for line in results:
-                if current_len + len(line) + 1 > 4000:
-                    await event.respond("\n".join(current_chunk))
-                    current_chunk = [line]
-                    current_len = len(line)
-                else:
-                    current_chunk.append(line)
-                    current_len += len(line) + 1
-            if current_chunk:
+        results = await asyncio.gather(*(audit(idx, g) for idx, g in enumerate(list(groups_list), 1)))
+        
+        # Delete progress message safely
+        try:
+            await progress_msg.delete()
+        except Exception:
+            pass
+
+        # Send chunked responses
+        current_chunk = ["📊 **Group Health Report**", "━━━━━━━━━━━━━━━━━━"]
+        current_len = sum(len(line) for line in current_chunk)
+        for line in results:
+            if current_len + len(line) + 1 > 4000:
                 await event.respond("\n".join(current_chunk))
+                current_chunk = [line]
+                current_len = len(line)
+            else:
+                current_chunk.append(line)
+                current_len += len(line) + 1
+        if current_chunk:
+            await event.respond("\n".join(current_chunk))
+
+    async def cmd_errors(event, text, now):
+        arg = text[len(".error"):].strip() if text.startswith(".error") else text[len(".errors"):].strip()
+        # If command started with space, strip it further
+        if arg.startswith("s"): # just in case of typos
+            arg = arg[1:].strip()
+        
+        if arg.lower() == "clear":
+            user_state["errors"] = []
+            await asyncio.to_thread(db.clear_errors, phone)
+            await event.respond("🗑️ Error logs cleared successfully.")
+            return
 
-        elif text.startswith(".errors") or text.startswith(".error"):
-            arg = text[len(".error"):].strip() if text.startswith(".error") else text[len(".errors"):].strip()
-            # If command started with space, strip it further
-            if arg.startswith("s"): # just in case of typos
-                arg = arg[1:].strip()
-            
-            if arg.lower() == "clear":
-                user_state["errors"] = []
-                db.clear_errors(phone)
-                await event.respond("🗑️ Error logs cleared successfully.")
-                return
-
-            if arg.isdigit():
-                idx = int(arg) - 1
-                errs = user_state.get("errors", [])
-                if idx < 0 or idx >= len(errs):
-                    await event.respond(f"⚠️ Invalid error index. Range: 1-{len(errs)}")
-                else:
-                    err = errs[idx]
-                    details = err.get("details") or "No further traceback details available."
-                    # Send traceback details inside code block
-                    reply = (
-                        f"❌ **Error Detail #{idx + 1}**\n"
-                        f"🕒 **Time:** `{err['timestamp']}`\n"
-                        f"📝 **Message:** `{err['message']}`\n"
-                        f"━━━━━━━━━━━━━━━━━━\n"
-                        f"🔍 **Traceback / Context:**\n"
-                        f"```python\n{details}\n```"
-                    )
-                    await event.respond(reply)
-                return
-
-            err_list = user_state.get("errors", [])
-            if not err_list:
-                await event.respond("📋 No errors recorded.")
+        if arg.isdigit():
+            idx = int(arg) - 1
+            errs = user_state.get("errors", [])
+            if idx < 0 or idx >= len(errs):
+                await event.respond(f"⚠️ Invalid error index. Range: 1-{len(errs)}")
             else:
-                lines = [
-                    "❌ **Recent Error Console**",
-                    f"👤 **Account:** {config.get('name')} ({phone})",
-                    "━━━━━━━━━━━━━━━━━━"
-                ]
-                for i, err in enumerate(err_list, 1):
-                    # Show index and formatted error time/message
-                    lines.append(f"{i}. `[{err['timestamp']}]` {err['message']}")
-                lines.append("━━━━━━━━━━━━━━━━━━")
-                lines.append("💡 Type `.error <num>` to see detailed tracebacks.")
-                lines.append("💡 Type `.error clear` to reset the log.")
-                await event.respond("\n".join(lines))
-
-        elif text.startswith(".help"):
-            await event.respond(
-                "🎁 **TELETHON V5 ELITE ADVANCED MODULE**\n\n"
-                "🛠 **Timing & Mode Configuration:**\n"
-                "• `.time <m|h>` — Set cycle interval\n"
-                "• `.delay <sec>` — Set message spacing\n"
-                "• `.mode <copy|forward>` — Switch sending style\n"
-                "\n🛰 **Target Groups Management:**\n"
-                "• `.add <url>` (or `.addgroup`) — Add target group(s)\n"
-                "• `.delgroup <url>` — Remove specific group(s)\n"
-                "• `.delall` (or `.delgroup all`) — Clear all target groups\n"
-                "• `.groups` — Show all target groups\n"
-                "• `.join <url>` — Join new groups (bulk support)\n"
-                "• `.check` — Audit send permissions on all groups\n"
-                "\n📊 **System Monitoring & Settings:**\n"
-                "• `.stats` — Display detailed runtime metrics & speed\n"
-                "• `.status` — Display sleek system configuration state\n"
-                "• `.info` | `.night` — Account details and Auto-Night window\n"
-                "• `.error` — Display recent error/failure logs"
-            )
+                err = errs[idx]
+                details = err.get("details") or "No further traceback details available."
+                # Send traceback details inside code block
+                reply = (
+                    f"❌ **Error Detail #{idx + 1}**\n"
+                    f"🕒 **Time:** `{err['timestamp']}`\n"
+                    f"📝 **Message:** `{err['message']}`\n"
+                    f"━━━━━━━━━━━━━━━━━━\n"
+                    f"🔍 **Traceback / Context:**\n"
+                    f"```python\n{details}\n```"
+                )
+                await event.respond(reply)
+            return
+
+        err_list = user_state.get("errors", [])
+        if not err_list:
+            await event.respond("📋 No errors recorded.")
+        else:
+            lines = [
+                "❌ **Recent Error Console**",
+                f"👤 **Account:** {config.get('name')} ({phone})",
+                "━━━━━━━━━━━━━━━━━━"
+            ]
+            for i, err in enumerate(err_list, 1):
+                # Show index and formatted error time/message
+                lines.append(f"{i}. `[{err['timestamp']}]` {err['message']}")
+            lines.append("━━━━━━━━━━━━━━━━━━")
+            lines.append("💡 Type `.error <num>` to see detailed tracebacks.")
+            lines.append("💡 Type `.error clear` to reset the log.")
+            await event.respond("\n".join(lines))
+
+    async def cmd_reload(event, text, now):
+        user_state["saved_cache"] = None
+        await event.respond("🔄 Saved Messages cache cleared. They will be re-fetched next cycle.")
+
+    async def cmd_help(event, text, now):
+        await event.respond(
+            "🎁 **TELETHON V5 ELITE ADVANCED MODULE**\n\n"
+            "🛠 **Timing & Mode Configuration:**\n"
+            "• `.time <m|h>` — Set cycle interval\n"
+            "• `.delay <sec>` — Set message spacing\n"
+            "• `.mode <copy|forward>` — Switch sending style\n"
+            "\n🛰 **Target Groups Management:**\n"
+            "• `.add <url>` (or `.addgroup`) — Add target group(s)\n"
+            "• `.delgroup <url>` — Remove specific group(s)\n"
+            "• `.delall` (or `.delgroup all`) — Clear all target groups\n"
+            "• `.groups` — Show all target groups\n"
+            "• `.join <url>` — Join new groups (bulk support)\n"
+            "• `.check` — Audit send permissions on all groups\n"
+            "\n📊 **System Monitoring & Settings:**\n"
+            "• `.stats` — Display detailed runtime metrics & speed\n"
+            "• `.status` — Display sleek system configuration state\n"
+            "• `.info` | `.night` — Account details and Auto-Night window\n"
+            "• `.error` — Display recent error/failure logs\n"
+            "• `.reload` — Re-fetch Saved Messages on the next cycle"
+        )
+
+    # Command table, built once per bot; keyed by command prefix
+    commands = {
+        ".time": cmd_time,
+        ".delay": cmd_delay,
+        ".status": cmd_status,
+        ".stats": cmd_stats,
+        ".info": cmd_info,
+        ".add": cmd_add,
+        ".addgroup": cmd_add,
+        ".delall": cmd_delall,
+        ".delgroup": cmd_delgroup,
+        ".groups": cmd_groups,
+        ".night": cmd_night,
+        ".mode": cmd_mode,
+        ".join": cmd_join,
+        ".check": cmd_check,
+        ".error": cmd_errors,
+        ".errors": cmd_errors,
+        ".reload": cmd_reload,
+        ".help": cmd_help,
+    }
+    # Longest first, so ".addgroup" wins over ".add" and ".errors" over ".error";
+    # arguments may follow without a space (".delay30"), as they always could
+    command_prefixes = sorted(commands, key=len, reverse=True)
+
+    # Only our own dot-messages ever reach the handler
+    @client.on(events.NewMessage(outgoing=True, pattern=_CMD_PREFIX_RE))
+    @command_wrapper
+    async def command_handler(event):
+        text = (event.raw_text or "").strip()
+        if not text.startswith("."):
+            return
+        # Setup auto-delete for command and its responses
+        orig_respond = event.respond
+        async def auto_delete_respond(*args, **kwargs):
+            resp = await orig_respond(*args, **kwargs)
+            if resp:
+                asyncio.create_task(delayed_delete(event.chat_id, [event.id, resp.id]))
+            return resp
+        event.respond = auto_delete_respond
+
+        # Ensure command itself is deleted after 40s even if no respond() is called
+        asyncio.create_task(delayed_delete(event.chat_id, [event.id]))
+
+        prefix = next((p for p in command_prefixes if text.startswith(p)), None)
+        if prefix is None:
+            return
+        handler = commands[prefix]
+
+        # One clock reading per command, shared by the handlers
+        tz = AUTONIGHT_CFG.get("tz", DEFAULT_AUTONIGHT["tz"])
+        now = _get_now_tz(tz)
+        await handler(event, text, now)
+
 
     async def forward_loop():
+        # Snapshot of config["groups"], refreshed only when groups_version changes
+        cached_groups = ()
+        cached_version = -1
+        # group URL -> resolved entity; failed lookups are not cached so they are retried
+        entity_cache = {}
+        # Quiet windows have minute resolution, so a result holds until the minute ends:
+        # [compiled settings, quiet?, loop time it is valid until]
+        quiet_memo = [None, False, 0.0]
+        error_streak = 0  # consecutive unexpected errors, drives the retry backoff
+        loop = asyncio.get_running_loop()
+
+        def quiet_now() -> bool:
+            if not AUTONIGHT_CFG.get("enabled", True):
+                return False
+            t = loop.time()
+            try:
+                an = _compile_autonight(AUTONIGHT_CFG)
+            except Exception:
+                # Fail open if config broken, same as autonight_is_quiet
+                quiet_memo[:] = [None, False, t + 60]
+                return False
+            if quiet_memo[0] is an and t < quiet_memo[2]:
+                return quiet_memo[1]
+            now = _get_now_tz(an.tz)
+            quiet = autonight_is_quiet(AUTONIGHT_CFG, now)
+            quiet_memo[:] = [an, quiet, t + 60 - now.second - now.microsecond / 1e6]
+            return quiet
+
         while True:
             tz = AUTONIGHT_CFG.get("tz", DEFAULT_AUTONIGHT["tz"])
             try:
@@ -891,10 +998,10 @@ async def run_user_bot(config):
                 while autonight_is_quiet(AUTONIGHT_CFG):
                     user_state["status"] = "Quiet Mode 🌙"
                     secs_to_end = _seconds_until_quiet_end(AUTONIGHT_CFG)
-                    # Sleep max 60s at a time to allow immediate wake-up if config changes
+                    # Sleep max 60s at a time; .night changes wake us immediately
                     sleep_step = min(secs_to_end, 60)
                     if sleep_step > 0:
-                        await asyncio.sleep(sleep_step)
+                        await sleep_or_wake(user_state["wake"], sleep_step)
                     else:
                         break # safety break
                 
@@ -905,46 +1012,61 @@ async def run_user_bot(config):
                     user_state["status"] = "Idle (No Groups) 😴"
                     now = _get_now_tz(tz)
                     user_state["next_msg_at"] = now + timedelta(minutes=user_state["cycle"])
-                    await interruptible_sleep(lambda: user_state["next_msg_at"], tz)
+                    await interruptible_sleep(lambda: user_state["next_msg_at"], tz, user_state["wake"])
                     continue
 
-                # 💎 Fetch all messages from Saved Messages (up to 100)
+                # 💎 Fetch all messages from Saved Messages (up to 100, cached between cycles)
                 user_state["status"] = "Fetching Msgs 🔍"
-                messages = await client.get_messages("me", limit=100)
+                messages = await fetch_saved_messages()
+                error_streak = 0
                 
-                # Filter out messages that cannot be sent (empty text & no media)
-                valid_messages = [m for m in messages if m.text or m.media]
-                valid_messages.reverse()
+                # Filter out messages that cannot be sent (empty text & no media),
+                # walking the newest-first cache backwards to get oldest-first order
+                valid_messages = [m for m in reversed(messages) if m.text or m.media]
 
                 if not valid_messages:
                     log_event("No valid messages in Saved Messages.")
                     user_state["status"] = "Idle (No Msg) 😴"
                     now = _get_now_tz(tz)
                     user_state["next_msg_at"] = now + timedelta(minutes=user_state["cycle"])
-                    await interruptible_sleep(lambda: user_state["next_msg_at"], tz)
+                    await interruptible_sleep(lambda: user_state["next_msg_at"], tz, user_state["wake"])
                     continue
 
                 # Forward messages one by one
+                mn = len(valid_messages)
                 for msg_idx, msg in enumerate(valid_messages, 1):
-                    log_event(f"Processing message {msg_idx}/{len(valid_messages)}")
+                    log_event(f"Processing message {msg_idx}/{mn}")
                     interrupted_by_night = False
                     
                     user_state["current_cycle_success"] = 0
                     user_state["current_cycle_fail"] = 0
 
-                    groups_list = config.setdefault("groups", [])
-                    for i, group in enumerate(groups_list, 1):
+                    if user_state["groups_version"] != cached_version:
+                        cached_groups = tuple(config.setdefault("groups", []))
+                        cached_version = user_state["groups_version"]
+                        entity_cache = {g: e for g, e in entity_cache.items() if g in cached_groups}
+                    gn = len(cached_groups)
+                    # Resolve only targets not seen yet, in parallel; the sends
+                    # themselves stay spaced by the configured delay
+                    missing = [g for g in cached_groups if g not in entity_cache]
+                    if missing:
+                        resolved = await resolve_group_entities(client, missing)
+                        for g, entity in zip(missing, resolved):
+                            if not isinstance(entity, str):
+                                entity_cache[g] = entity
+                    targets = [entity_cache.get(g, g) for g in cached_groups]
+                    for i, group in enumerate(cached_groups, 1):
                         # If night starts mid-cycle, break early
-                        if autonight_is_quiet(AUTONIGHT_CFG):
+                        if quiet_now():
                             interrupted_by_night = True
                             break
 
-                        user_state["status"] = f"Msg {msg_idx} -> Grp {i}/{len(groups_list)} 📡"
+                        user_state["status"] = f"Msg {msg_idx} -> Grp {i}/{gn} 📡"
                         send_start = _get_now_tz(tz)
                         custom_sleep_done = False
                         
                         try:
-                            target_entity = await resolve_group_entity(client, group)
+                            target_entity = targets[i - 1]
                             if user_state["use_copy"]:
                                 # 🌈 Copy Mode
                                 caption = msg.text or ""
@@ -966,17 +1088,17 @@ async def run_user_bot(config):
                              user_state["status"] = f"FloodWait ⏳ ({e.seconds}s)"
                              user_state["delay"] = min(user_state["delay"] + 20, 600)
                              config["msg_delay_sec"] = user_state["delay"]
-                             db.update_user_config(phone, msg_delay_sec=user_state["delay"])
+                             schedule_config_save(msg_delay_sec=user_state["delay"])
                              now = _get_now_tz(tz)
                              user_state["next_msg_at"] = now + timedelta(seconds=e.seconds + 5)
-                             await interruptible_sleep(lambda: user_state["next_msg_at"], tz)
+                             await interruptible_sleep(lambda: user_state["next_msg_at"], tz, user_state["wake"])
                              custom_sleep_done = True
                         except SlowModeWaitError as e:
                              log_event(f"Slowmode in {group}. Waiting {e.seconds}s")
                              user_state["status"] = f"Slowmode ⏳ ({e.seconds}s)"
                              now = _get_now_tz(tz)
                              user_state["next_msg_at"] = now + timedelta(seconds=e.seconds + 2)
-                             await interruptible_sleep(lambda: user_state["next_msg_at"], tz)
+                             await interruptible_sleep(lambda: user_state["next_msg_at"], tz, user_state["wake"])
                              custom_sleep_done = True
                         except ChatWriteForbiddenError:
                             log_event(f"No permission in {group}")
@@ -988,9 +1110,11 @@ async def run_user_bot(config):
                              log_event(f"Failed {group}: {type(e).__name__} - {e}", details=tb_str)
                              user_state["fail_total"] += 1
                              user_state["current_cycle_fail"] += 1
+                             # The cached peer may be stale (username changed, group gone); resolve it again next time
+                             entity_cache.pop(group, None)
 
                         # Always sleep the delay between groups (unless custom sleep occurred or it is the last group)
-                        if i < len(groups_list) and not custom_sleep_done:
+                        if i < gn and not custom_sleep_done:
                             wait_time = user_state["delay"] * random.uniform(0.9, 1.1)
                             # Subtract the message-sending duration to avoid latency drift accumulation
                             elapsed = (_get_now_tz(tz) - send_start).total_seconds()
@@ -998,8 +1122,8 @@ async def run_user_bot(config):
                             
                             now = _get_now_tz(tz)
                             user_state["next_msg_at"] = now + timedelta(seconds=remaining_wait)
-                            await interruptible_sleep(lambda: user_state["next_msg_at"], tz)
-                        elif i == len(groups_list):
+                            await interruptible_sleep(lambda: user_state["next_msg_at"], tz, user_state["wake"])
+                        elif i == gn:
                             user_state["next_msg_at"] = None
 
                     if interrupted_by_night:
@@ -1010,61 +1134,94 @@ async def run_user_bot(config):
                         if user_state["delay"] > 25:
                             user_state["delay"] -= 2
                             config["msg_delay_sec"] = user_state["delay"]
-                            db.update_user_config(phone, msg_delay_sec=user_state["delay"])
+                            schedule_config_save(msg_delay_sec=user_state["delay"])
 
                     log_event(f"Msg {msg_idx} cycle complete. Success: {user_state['current_cycle_success']}, Fail: {user_state['current_cycle_fail']}")
                     
                     # Interval delay between different messages (with organic Timing Jitter)
-                    if msg_idx < len(valid_messages):
+                    if msg_idx < mn:
                         user_state["status"] = f"Waiting for next msg ⏳"
                         now = _get_now_tz(tz)
                         sleep_seconds = _get_cycle_seconds_with_jitter(user_state["cycle"])
                         user_state["next_msg_at"] = now + timedelta(seconds=sleep_seconds)
-                        await interruptible_sleep(lambda: user_state["next_msg_at"], tz)
+                        await interruptible_sleep(lambda: user_state["next_msg_at"], tz, user_state["wake"])
 
                 # After all messages are processed, wait the cycle delay again before checking for new messages (with organic Timing Jitter)
                 user_state["status"] = "Idle 😴"
                 now = _get_now_tz(tz)
                 sleep_seconds = _get_cycle_seconds_with_jitter(user_state["cycle"])
                 user_state["next_msg_at"] = now + timedelta(seconds=sleep_seconds)
-                await interruptible_sleep(lambda: user_state["next_msg_at"], tz)
+                await interruptible_sleep(lambda: user_state["next_msg_at"], tz, user_state["wake"])
 
+            except FloodWaitError as e:
+                # Telegram told us exactly how long to stay away
+                log_event(f"FloodWait in forward loop! Sleeping {e.seconds}s.")
+                user_state["status"] = f"FloodWait ⏳ ({e.seconds}s)"
+                await asyncio.sleep(e.seconds + 1)
             except Exception as e:
                 import traceback
                 tb_str = traceback.format_exc()
                 log_event(f"Error in forward loop: {e}", details=tb_str)
-                await asyncio.sleep(60)
+                # Back off exponentially (with jitter) while the failure persists
+                backoff = min(ERROR_BACKOFF_BASE * 2 ** error_streak, ERROR_BACKOFF_MAX)
+                error_streak += 1
+                await asyncio.sleep(backoff * random.uniform(0.9, 1.1))
 
 
-    asyncio.create_task(forward_loop())
+    forward_task = asyncio.create_task(forward_loop())
     try:
         await client.run_until_disconnected()
     except Exception as e:
-        logger.error(f"[{phone}] Disconnected with error: {e}")
+        logger.error("[%s] Disconnected with error: %s", phone, e)
     finally:
+        # Stop sending before the client goes away
+        forward_task.cancel()
         active_bots.pop(phone, None)
+        if pending_config:
+            await flush_config(delay=0)
         try:
             await client.disconnect()
         except Exception:
             pass
-        if phone in started_phones:
-            started_phones.remove(phone)
         log_event(f"Bot for {phone} stopped.")
 
 async def user_loader():
     config_mtimes = {} # phone -> last_updated_at
+    seen_version = None
     while True:
+        # Cheap change detection: only re-read settings/users after a commit
         try:
-            configs = db.get_all_user_configs()
-            for config in configs:
-                phone = config.get("phone")
-                updated_at = config.get("updated_at", 0.0)
+            version = await asyncio.to_thread(db.get_data_version)
+        except Exception as e:
+            logger.error("Error polling database version: %s", e)
+            version = None
+        if version is not None and version == seen_version:
+            await asyncio.sleep(LOADER_POLL_SEC)
+            continue
+
+        loaded = True
+        try:
+            # Single shared Auto-Night refresh per tick for all running bots
+            new_autonight = await asyncio.to_thread(_load_autonight)
+            if new_autonight != AUTONIGHT_CFG:
+                reload_autonight_cfg(new_autonight)
+                wake_bots()
+        except Exception as e:
+            loaded = False
+            logger.error("Error loading Auto-Night settings from database: %s", e)
+        try:
+            versions = await asyncio.to_thread(db.get_user_versions)
+            for phone, updated_at in versions.items():
                 if not phone:
                     continue
-                # Only load if new or modified
+                # Only load the full config if new or modified
                 if phone not in config_mtimes or updated_at > config_mtimes[phone]:
-                    if phone not in started_phones:
-                        asyncio.create_task(run_user_bot(config))
+                    config = await asyncio.to_thread(db.get_user_config, phone)
+                    if not config:
+                        continue
+                    task = bot_tasks.get(phone)
+                    if task is None or task.done():
+                        bot_tasks[phone] = asyncio.create_task(run_user_bot(config))
                     else:
                         # Update active bot in place
                         if phone in active_bots:
@@ -1072,12 +1229,25 @@ async def user_loader():
                             bot["config"].update(config)
                             # Sync state values
                             state = bot["state"]
+                            state["groups_version"] += 1
                             state["delay"] = config.get("msg_delay_sec", 20)
                             state["cycle"] = config.get("cycle_delay_min", 7)
                     config_mtimes[phone] = updated_at
+
+            # Stop bots whose account was removed from the database
+            for phone in [p for p in config_mtimes if p not in versions]:
+                config_mtimes.pop(phone, None)
+                task = bot_tasks.pop(phone, None)
+                if task is not None and not task.done():
+                    logger.info("[%s] Account removed, stopping bot.", phone)
+                    task.cancel()
         except Exception as e:
-            logger.error(f"Error loading user configs from database: {e}")
-        await asyncio.sleep(10) # Check every 10s for faster configuration updates
+            loaded = False
+            logger.error("Error loading user configs from database: %s", e)
+        if loaded:
+            seen_version = version
+        # Without a version to watch, fall back to plain periodic reloads
+        await asyncio.sleep(LOADER_POLL_SEC if version is not None else LOADER_FALLBACK_SEC)
 
 async def main():
     os.makedirs(SESSIONS_DIR, exist_ok=True)
@@ -1116,6 +1286,8 @@ async def main():
             pass
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         asyncio.run(main())
     except (KeyboardInterrupt, SystemExit):
@@ -1125,3 +1297,6 @@ if __name__ == "__main__":
                 os.remove(PID_FILE)
         except Exception:
             pass
+    finally:
+        # Flush any queued log records before the interpreter exits
+        log_listener.stop()